@@ -9,6 +9,7 @@ import threading
 import requests
 import json
 import time
+import atexit
 import logging
 from datetime import datetime
 import os
@@ -99,21 +100,14 @@ def migrate_legacy_json_data():
             with open(legacy_file, 'r') as f:
                 legacy_requests = json.load(f)
             
-            migrated_count = 0
-            for request in legacy_requests:
-                if request.get('status') == 'pending':
-                    card_id = request.get('card_id')
-                    name = request.get('name', '')
-                    first_name = request.get('first_name', '')
-                    last_name = request.get('last_name', '')
-                    email = request.get('email', '')
-                    
-                    # Check if already exists in database
-                    if not db.get_pending_request(card_id) and not db.get_user(card_id):
-                        success = db.add_pending_request(card_id, name, first_name, last_name, email, '', '')
-                        if success:
-                            migrated_count += 1
-                            logger.info(f"Migrated pending request: {card_id} - {name}")
+            # Cards already in the database are skipped by the import
+            pending = [
+                (request.get('card_id'), request.get('name', ''), request.get('first_name', ''),
+                 request.get('last_name', ''), request.get('email', ''), '', '')
+                for request in legacy_requests
+                if request.get('status') == 'pending'
+            ]
+            migrated_count = db.import_pending_requests(pending)
             
             # Move the legacy file to backup
             backup_file = f"{legacy_file}.migrated.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -168,9 +162,13 @@ def handle_card_read(card_data):
         db.log_scan_event(card_id, 'scan')
         
         # STEP 2: Check if card is in users table
-        user = db.get_user(card_id)
-        if user:
-            # User exists - unlock shear
+        auth = db.get_user_for_auth(card_id)
+        if auth:
+            # User exists - unlock shear with the full record (served from the cache auth just filled)
+            user = db.get_user(card_id)
+            if user is None:
+                name, access_level, status = auth
+                user = {'card_id': card_id, 'name': name, 'access_level': access_level, 'status': status}
             unlock_shear(card_id, user)
             
             # Update last access time
@@ -782,30 +780,18 @@ def api_deny_access_request(card_id):
 def api_users():
     """Get all users"""
     try:
-        users = db.get_all_users()
-        formatted_users = []
-        for user in users:
-            if not isinstance(user, dict):
-                logger.warning(f"Unexpected user record type in get_all_users(): {type(user)} -> {user}")
-                continue
-            # Safely extract fields with defaults
-            shift_val = ''
-            try:
-                shift_val = user['shift'] if user.get('shift') is not None else ''
-            except Exception:
-                # If even this fails, leave shift blank
-                shift_val = ''
-            try:
-                formatted_users.append({
-                    'card_id': user.get('card_id', ''),
-                    'name': user.get('name', ''),
-                    'access_level': user.get('access_level', ''),
-                    'department': user.get('department', ''),
-                    'shift': shift_val,
-                    'active': user.get('status', '') == 'active'
-                })
-            except Exception as inner_e:
-                logger.error(f"Failed to format user record {user}: {inner_e}")
+        # Build the response straight from the namedtuple rows; no intermediate dicts
+        formatted_users = [
+            {
+                'card_id': user.card_id,
+                'name': user.name,
+                'access_level': user.access_level,
+                'department': user.department,
+                'shift': user.shift or '',
+                'active': user.status == 'active'
+            }
+            for user in db.iter_user_records()
+        ]
         return jsonify({'success': True, 'users': formatted_users})
     except Exception as e:
         logger.error(f"Error getting users: {e}")
@@ -1470,18 +1456,9 @@ def submit_access_request():
         if existing_user:
             return jsonify({'success': False, 'message': 'Card already has access'}), 400
         
-        # Check if pending request already exists
-        existing_request = db.get_pending_request(card_id)
-        if existing_request:
-            # Update existing request with user information
-            full_name = f"{first_name} {last_name}".strip()
-            success = db.remove_pending_request(card_id)
-            if success:
-                success = db.add_pending_request(card_id, full_name, first_name, last_name, '', department, shift)
-        else:
-            # Create new pending request
-            full_name = f"{first_name} {last_name}".strip()
-            success = db.add_pending_request(card_id, full_name, first_name, last_name, '', department, shift)
+        # Create the pending request, or update an existing one with the user information
+        full_name = f"{first_name} {last_name}".strip()
+        success = db.upsert_pending_request(card_id, full_name, first_name, last_name, '', department, shift)
         
         if success:
             # If auto-accept is enabled, immediately convert to active user
@@ -1879,6 +1856,9 @@ if __name__ == '__main__':
     # Initialize components
     initialize_components()
     
+    # Refresh database statistics on graceful shutdown
+    atexit.register(db.optimize_database)
+    
     # Start card reader in background thread
     if card_reader:
         reader_thread = threading.Thread(target=start_card_reader, daemon=True)
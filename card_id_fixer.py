@@ -95,17 +95,14 @@ def complete_user_removal(card_id):
     
     print(f"=== COMPLETE USER REMOVAL: {card_id} ===")
     
-    # Remove user
-    result = db.remove_user(card_id)
-    if result:
+    # Remove user and verify removal in one transaction
+    verification = db.remove_user_and_verify(card_id)
+    if 'error' not in verification:
         print(f"✅ User removal command executed successfully")
     else:
         print(f"❌ User removal command failed")
         return
     
-    # Verify removal
-    verification = db.verify_user_removal(card_id)
-    
     print(f"\n--- VERIFICATION RESULTS ---")
     print(f"Card ID: {verification['card_id']}")
     print(f"Status: {verification['status']}")
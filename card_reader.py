@@ -4,13 +4,41 @@ Handles USB HID card reader communication
 """
 
 import hid
+import os
+import queue
+import random
 import threading
 import time
 import logging
-from typing import Optional, Callable, Dict, Any
+from enum import IntEnum
+from typing import Optional, Callable, Dict, Any, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Set CARD_READER_DEBUG=1 to print every raw HID report to the console
+_DEBUG_HID = os.environ.get('CARD_READER_DEBUG') == '1'
+
+# RDR-6081AKU vendor IDs and product name fragments
+RDR_6081_PATTERNS = (
+    (0x076b, ('rdr', '6081')),  # HID Global
+    (0x0c27, ('rdr', '6081')),  # Alternative vendor
+    (0x08f2, ('rdr', '6081')),  # Another common vendor
+)
+
+# Generic name fragments that suggest a card reader
+CARD_READER_KEYWORDS = ('card', 'reader', 'rfid', 'proximity', 'hid', 'rdr')
+
+# bytes.translate() deletion tables: everything except printable ASCII / digits / alphanumerics and space
+_NON_PRINTABLE = bytes(b for b in range(256) if not 32 <= b <= 126)
+_NON_DIGIT = bytes(b for b in range(256) if not 48 <= b <= 57)
+_NON_ALNUM_SPACE = bytes(b for b in range(256) if not (chr(b).isascii() and (chr(b).isalnum() or b == 32)))
+
+class ConnState(IntEnum):
+    """Card reader connection state"""
+    DISCONNECTED = 0
+    CONNECTED = 1
+    ERROR = 2
+
 class CardReader:
     """USB HID Card Reader handler"""
     
@@ -19,57 +47,80 @@ class CardReader:
         self.vendor_id = vendor_id or 0x0c27  # Default to RFIDeas RDR-6081AKU
         self.product_id = product_id or 0x3bfa
         self.device = None
+        self._state = ConnState.DISCONNECTED
         self.running = False
+        self._stop = threading.Event()  # Set by stop_monitoring to cut monitor_loop's sleeps short
         self.monitor_thread = None
-        self.card_buffer = []
-        self.last_read_time = 0
+        self.dispatch_thread = None
+        self._card_queue = queue.SimpleQueue()  # Hands card reads from monitor_loop to dispatch_loop
+        self.card_buffer = bytearray()
+        self.last_read_time = 0  # time.monotonic() of the last HID report
         self.card_timeout = 0.5  # 500ms timeout between complete card reads
         self.last_processed_card = None  # Track last processed card to prevent duplicates
         self.duplicate_timeout = 2.0  # 2 seconds before allowing same card again
+        self.reconnect_delay_max = 60.0  # Cap for exponential reconnect backoff
+        self.read_timeout_ms = 1000  # Longest a blocking HID read waits (bounds stop_monitoring latency)
+        self._reconnect_delay = 1.0
+        self._match_cache: Dict[Tuple[int, int], Optional[str]] = {}  # (vid, pid) -> classification
+        
+    def _set_state(self, state: ConnState):
+        """Record a connection state transition"""
+        if state is not self._state:
+            logger.info(f"Card reader state: {self._state.name} -> {state.name}")
+            self._state = state
+    
+    def _classify_device(self, device_info: Dict[str, Any]) -> Optional[str]:
+        """Classify an enumerated HID device, memoized by (vendor_id, product_id)
         
+        Returns 'rdr-6081' for a known RDR-6081AKU pattern, 'keyword' for a generic
+        card reader name match, or None if the device is not a card reader.
+        """
+        key = (device_info['vendor_id'], device_info['product_id'])
+        if key in self._match_cache:
+            return self._match_cache[key]
+        
+        product_name = (device_info.get('product_string') or '').lower()
+        manufacturer = (device_info.get('manufacturer_string') or '').lower()
+        
+        match = None
+        for vendor_id, name_parts in RDR_6081_PATTERNS:
+            if device_info['vendor_id'] == vendor_id and any(part in product_name for part in name_parts):
+                match = 'rdr-6081'
+                break
+        
+        if match is None:
+            for keyword in CARD_READER_KEYWORDS:
+                if keyword in product_name or keyword in manufacturer:
+                    match = 'keyword'
+                    break
+        
+        self._match_cache[key] = match
+        return match
+    
     def find_card_reader(self) -> Optional[Dict[str, Any]]:
         """Find connected card reader device"""
         try:
-            # List all HID devices
-            devices = hid.enumerate()
-            
-            # If specific vendor/product ID provided, look for that
+            # If specific vendor/product ID provided, let hidapi filter for it so only
+            # the matching device's descriptors and strings are read
             if self.vendor_id and self.product_id:
-                for device_info in devices:
-                    if (device_info['vendor_id'] == self.vendor_id and 
-                        device_info['product_id'] == self.product_id):
-                        return device_info
+                devices = hid.enumerate(self.vendor_id, self.product_id)
+                if devices:
+                    return devices[0]
             
-            # Look for RDR-6081AKU specifically (HID Global devices often use vendor ID 0x076b)
-            rdr_6081_patterns = [
-                {'vendor_id': 0x076b, 'product_name_contains': ['rdr', '6081']},  # HID Global
-                {'vendor_id': 0x0c27, 'product_name_contains': ['rdr', '6081']},  # Alternative vendor
-                {'vendor_id': 0x08f2, 'product_name_contains': ['rdr', '6081']},  # Another common vendor
-            ]
+            # Otherwise list all HID devices and search them by name
+            devices = hid.enumerate()
             
+            # Look for RDR-6081AKU specifically (HID Global devices often use vendor ID 0x076b)
             for device_info in devices:
-                product_name = device_info.get('product_string', '').lower()
-                manufacturer = device_info.get('manufacturer_string', '').lower()
-                
-                # Check for specific RDR-6081AKU patterns
-                for pattern in rdr_6081_patterns:
-                    if device_info['vendor_id'] == pattern['vendor_id']:
-                        for name_part in pattern['product_name_contains']:
-                            if name_part in product_name:
-                                logger.info(f"Found RDR-6081AKU card reader: {device_info}")
-                                return device_info
+                if self._classify_device(device_info) == 'rdr-6081':
+                    logger.info(f"Found RDR-6081AKU card reader: {device_info}")
+                    return device_info
             
             # Otherwise, look for common card reader patterns
-            card_reader_keywords = ['card', 'reader', 'rfid', 'proximity', 'hid', 'rdr']
-            
             for device_info in devices:
-                product_name = device_info.get('product_string', '').lower()
-                manufacturer = device_info.get('manufacturer_string', '').lower()
-                
-                for keyword in card_reader_keywords:
-                    if keyword in product_name or keyword in manufacturer:
-                        logger.info(f"Found potential card reader: {device_info}")
-                        return device_info
+                if self._classify_device(device_info) == 'keyword':
+                    logger.info(f"Found potential card reader: {device_info}")
+                    return device_info
             
             # If no specific card reader found, list available devices for debugging
             logger.info("Available HID devices:")
@@ -92,12 +143,11 @@ class CardReader:
                 logger.warning("No card reader found")
                 return False
             
+            # Open by the path enumeration already resolved; open(vid, pid) would walk the bus again
             self.device = hid.device()
-            self.device.open(device_info['vendor_id'], device_info['product_id'])
-            
-            # Set non-blocking mode
-            self.device.set_nonblocking(1)
+            self.device.open_path(device_info['path'])
             
+            self._set_state(ConnState.CONNECTED)
             logger.info(f"Connected to card reader: {device_info.get('product_string', 'Unknown')}")
             return True
             
@@ -108,6 +158,7 @@ class CardReader:
     def disconnect(self):
         """Disconnect from card reader"""
         try:
+            self._set_state(ConnState.DISCONNECTED)
             if self.device:
                 self.device.close()
                 self.device = None
@@ -117,11 +168,11 @@ class CardReader:
     
     def is_connected(self) -> bool:
         """Check if card reader is connected"""
-        return self.device is not None
+        return self._state is ConnState.CONNECTED
     
     def get_device_info(self) -> Optional[Dict[str, Any]]:
         """Get device information"""
-        if not self.device:
+        if self._state is not ConnState.CONNECTED:
             return None
         
         try:
@@ -136,26 +187,25 @@ class CardReader:
     
     def read_card_data(self) -> Optional[Dict[str, Any]]:
         """Read data from card reader"""
-        if not self.device:
+        if self._state is not ConnState.CONNECTED:
             return None
         
         try:
-            # Read data from device (adjust buffer size as needed)
-            data = self.device.read(64)
+            # Block until a report arrives (or the timeout passes) so scans are picked up
+            # as soon as the USB interrupt completes instead of on the next poll
+            data = self.device.read(64, self.read_timeout_ms)
             
             if data:
-                logger.debug(f"Raw card data received: {data} (type: {type(data)})")
                 # Print raw card data to console for debugging
-                print(f"[CARD READER] Raw data: {data}")
-                print(f"[CARD READER] Data type: {type(data)}")
-                if isinstance(data, list):
-                    print(f"[CARD READER] Hex data: {' '.join([f'{b:02x}' for b in data])}")
-                else:
-                    print(f"[CARD READER] Hex data: {data.hex()}")
+                if __debug__ and _DEBUG_HID:
+                    print(f"[CARD READER] Raw data: {data}")
+                    print(f"[CARD READER] Data type: {type(data)}")
                 
                 # Convert list to bytes if needed (hid.device.read() returns a list)
                 if isinstance(data, list):
                     data = bytes(data)
+                if __debug__ and _DEBUG_HID:
+                    print(f"[CARD READER] Hex data: {data.hex(' ')}")
                 # Parse the raw data based on your card reader's protocol
                 card_data = self.parse_card_data(data)
                 return card_data
@@ -164,6 +214,13 @@ class CardReader:
             
         except Exception as e:
             logger.error(f"Error reading card data: {e}")
+            # Drop the handle so monitor_loop reconnects instead of re-reading a dead device
+            self._set_state(ConnState.ERROR)
+            try:
+                self.device.close()
+            except Exception:
+                pass
+            self.device = None
             return None
     
     def parse_card_data(self, raw_data) -> Dict[str, Any]:
@@ -173,16 +230,16 @@ class CardReader:
             if isinstance(raw_data, list):
                 raw_data = bytes(raw_data)
             
-            current_time = time.time()
+            current_time = time.monotonic()
             
             # Add non-zero bytes to buffer
-            new_bytes = [b for b in raw_data if b != 0]
+            new_bytes = raw_data.translate(None, b'\x00')
             if new_bytes:
                 # If it's been too long since last read, start new card
                 if current_time - self.last_read_time > self.card_timeout and self.card_buffer:
                     # Process previous card first, but don't return it immediately
                     # Instead, clear buffer and start fresh to prevent double processing
-                    self.card_buffer = []
+                    self.card_buffer = bytearray()
                     
                 # Add to current buffer
                 self.card_buffer.extend(new_bytes)
@@ -194,7 +251,7 @@ class CardReader:
                     card_result = self.process_card_buffer()
                     if card_result:
                         # Reset buffer for next card
-                        self.card_buffer = []
+                        self.card_buffer = bytearray()
                         return card_result
             
             return None  # No complete card yet
@@ -220,33 +277,44 @@ class CardReader:
             return None
         
         try:
-            # Create hex string from buffer
-            hex_data = ''.join([f"{b:02x}" for b in self.card_buffer]).upper()
-            
             # CONSISTENT PARSING: Always convert raw bytes to a numeric ID for consistency
             # This ensures all cards get the same treatment regardless of ASCII content
             
             # Method 1: Convert raw bytes to a decimal number (most consistent)
-            raw_int = 0
-            for i, byte in enumerate(self.card_buffer):
-                raw_int = (raw_int << 8) | byte
+            raw_int = int.from_bytes(self.card_buffer, 'big')
             
             # Use the decimal representation as card ID
             card_id = str(raw_int)
             id_type = "numeric_consistent"
             
+            # Only reject cards that are completely empty or zero
+            if not card_id or card_id == '0':
+                print(f"[CARD READER] EMPTY/ZERO CARD DATA - Rejecting card ID: '{card_id}'")
+                logger.warning(f"Empty or zero card data rejected: '{card_id}' - no usable data")
+                return None
+            
+            # Check for duplicate card reads to prevent double processing. This runs before
+            # the hex/ASCII formatting below so a rejected re-read costs no string building.
+            current_time = time.monotonic()
+            if (self.last_processed_card and 
+                self.last_processed_card['card_id'] == card_id and 
+                current_time - self.last_processed_card['timestamp'] < self.duplicate_timeout):
+                print(f"[CARD READER] DUPLICATE CARD DETECTED - Ignoring within {self.duplicate_timeout}s window")
+                return None
+            
             # Keep the other formats for debugging/logging purposes
-            full_hex = hex_data
-            ascii_data = ''.join([chr(b) for b in self.card_buffer if 32 <= b <= 126])
-            numeric_data = ''.join([chr(b) for b in self.card_buffer if 48 <= b <= 57])
-            filtered_ascii = ''.join([c for c in ascii_data if c.isalnum() or c.isspace()]).strip()
+            full_hex = self.card_buffer.hex().upper()
+            ascii_data = self.card_buffer.translate(None, _NON_PRINTABLE).decode('ascii')
+            numeric_data = self.card_buffer.translate(None, _NON_DIGIT).decode('ascii')
+            filtered_ascii = self.card_buffer.translate(None, _NON_ALNUM_SPACE).decode('ascii').strip()
             
-            logger.info(f"Card processed - Consistent Numeric ID: {card_id} (type: {id_type}), Full hex: {full_hex}, ASCII: '{ascii_data}', Raw bytes: {list(self.card_buffer)}")
+            logger.info(f"Card processed - Consistent Numeric ID: {card_id} (type: {id_type}), Full hex: {full_hex}, ASCII: '{ascii_data}'")
             
             # Print card processing info to console
             print(f"[CARD READER] ========== CARD PROCESSED ==========")
             print(f"[CARD READER] Consistent Card ID: {card_id} (type: {id_type})")
-            print(f"[CARD READER] Raw bytes: {list(self.card_buffer)}")
+            if __debug__ and _DEBUG_HID:
+                print(f"[CARD READER] Raw bytes: {self.card_buffer.hex(' ')}")
             print(f"[CARD READER] Full hex: {full_hex}")
             print(f"[CARD READER] ASCII representation: '{ascii_data}'")
             print(f"[CARD READER] Filtered ASCII: '{filtered_ascii}'")
@@ -254,20 +322,6 @@ class CardReader:
             print(f"[CARD READER] Buffer length: {len(self.card_buffer)} bytes")
             print(f"[CARD READER] =====================================")
             
-            # Only reject cards that are completely empty or zero
-            if not card_id or card_id == '0':
-                print(f"[CARD READER] EMPTY/ZERO CARD DATA - Rejecting card ID: '{card_id}'")
-                logger.warning(f"Empty or zero card data rejected: '{card_id}' - no usable data")
-                return None
-            
-            # Check for duplicate card reads to prevent double processing
-            current_time = time.time()
-            if (self.last_processed_card and 
-                self.last_processed_card['card_id'] == card_id and 
-                current_time - self.last_processed_card['timestamp'] < self.duplicate_timeout):
-                print(f"[CARD READER] DUPLICATE CARD DETECTED - Ignoring within {self.duplicate_timeout}s window")
-                return None
-            
             card_result = {
                 'card_id': card_id,
                 'raw_data': full_hex,
@@ -306,24 +360,38 @@ class CardReader:
                     # Try to reconnect
                     if self.connect():
                         logger.info("Card reader reconnected")
+                        self._reconnect_delay = 1.0
                     else:
-                        time.sleep(5)  # Wait before retry
+                        # Back off exponentially (with jitter) while the reader stays unplugged
+                        self._stop.wait(self._reconnect_delay + random.uniform(0, 0.25))
+                        self._reconnect_delay = min(self._reconnect_delay * 2, self.reconnect_delay_max)
                         continue
                 
                 # Read card data
                 card_data = self.read_card_data()
                 
                 if card_data and self.on_card_read:
-                    self.on_card_read(card_data)
-                
-                time.sleep(0.1)  # Small delay to prevent excessive CPU usage
+                    # Hand off to the dispatch thread so a slow callback never stalls HID reads
+                    self._card_queue.put_nowait(card_data)
                 
             except Exception as e:
                 logger.error(f"Error in monitor loop: {e}")
-                time.sleep(1)
+                self._stop.wait(1)
         
         logger.info("Card reader monitoring stopped")
     
+    def dispatch_loop(self):
+        """Deliver queued card reads to the on_card_read callback"""
+        while True:
+            card_data = self._card_queue.get()
+            if card_data is None:  # Sentinel from stop_monitoring
+                break
+            
+            try:
+                self.on_card_read(card_data)
+            except Exception as e:
+                logger.error(f"Error in card read callback: {e}")
+    
     def start_monitoring(self):
         """Start monitoring for card reads"""
         if self.running:
@@ -334,7 +402,10 @@ class CardReader:
             logger.error("Failed to connect to card reader")
             return
         
+        self._stop.clear()
         self.running = True
+        self.dispatch_thread = threading.Thread(target=self.dispatch_loop, daemon=True)
+        self.dispatch_thread.start()
         self.monitor_thread = threading.Thread(target=self.monitor_loop, daemon=True)
         self.monitor_thread.start()
         logger.info("Card reader monitoring thread started")
@@ -342,7 +413,11 @@ class CardReader:
     def stop_monitoring(self):
         """Stop monitoring for card reads"""
         self.running = False
+        self._stop.set()
         if self.monitor_thread and self.monitor_thread.is_alive():
             self.monitor_thread.join(timeout=5)
+        if self.dispatch_thread and self.dispatch_thread.is_alive():
+            self._card_queue.put_nowait(None)
+            self.dispatch_thread.join(timeout=5)
         self.disconnect()
         logger.info("Card reader monitoring stopped")
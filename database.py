@@ -5,70 +5,453 @@ Handles SQLite database operations for the shear application
 
 import sqlite3
 import logging
-from typing import List, Dict, Any, Optional
+import queue
+import threading
+import time
+import atexit
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Iterator
 from datetime import datetime
 import os
 
 logger = logging.getLogger(__name__)
 
 DB_FILE = 'shear_app.db'
+READ_POOL_SIZE = 5           # Concurrent readers; WAL lets them run alongside the writer
+STATEMENT_CACHE_SIZE = 256
+FETCH_SIZE = 1000            # Rows per fetchmany() when streaming result sets
+LOOKUP_CACHE_SIZE = 1024     # Card IDs kept in the get_user/get_pending_request caches
+LOOKUP_CACHE_TTL = 5.0       # Seconds a cached lookup is trusted (bounds staleness from other processes)
+USER_LIST_CACHE_TTL = 5.0    # Seconds the full user listing is reused between user writes
+WRITE_BATCH_SIZE = 100       # Max queued writes committed in one transaction
+WRITE_BATCH_DELAY = 0.05     # Seconds to wait for more writes before committing
+WRITE_FLUSH_TIMEOUT = 5.0    # Longest a read or maintenance call waits for queued writes
+
+# Applied once to every pooled connection when it is opened
+CONNECTION_PRAGMAS = (
+    'PRAGMA synchronous=NORMAL',  # Safe with WAL; commits no longer fsync every time
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA wal_autocheckpoint=1000',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-65536',    # 64 MB page cache: the whole users table plus recent scan events
+    'PRAGMA mmap_size=268435456',  # Read pages straight from a 256 MB memory map instead of pread()
+)
+
+def _open_connection(read_only: bool = False) -> sqlite3.Connection:
+    """Open a long-lived autocommit connection with CONNECTION_PRAGMAS applied"""
+    conn = sqlite3.connect(DB_FILE, check_same_thread=False, isolation_level=None,
+                           cached_statements=STATEMENT_CACHE_SIZE)
+    conn.row_factory = sqlite3.Row
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    if read_only:
+        conn.execute('PRAGMA query_only=1')
+    return conn
+
+class ConnectionPool:
+    """Bounded pool of long-lived SQLite connections
+    
+    Connections are opened lazily (up to `size`) in autocommit mode, so single
+    statements commit on their own and multi-statement writes use explicit
+    BEGIN/COMMIT. Connections go back to the pool instead of being closed,
+    which keeps SQLite's page cache warm between calls.
+    
+    Reads and writes use separate pools: a read_only pool of query_only
+    connections, and a single-connection write pool that serialises writers
+    without making readers wait for a free connection.
+    """
+    
+    def __init__(self, size: int, read_only: bool = False):
+        self.size = size
+        self.read_only = read_only
+        self._idle = queue.Queue(maxsize=size)
+        self._opened = 0
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def acquire(self):
+        """Check a connection out of the pool for the duration of a with-block"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    conn = _open_connection(self.read_only)
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                conn = self._idle.get()
+        
+        try:
+            yield conn
+        finally:
+            # Never hand a half-finished transaction to the next caller
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+class BatchWriter:
+    """Single background writer that coalesces queued writes into one transaction
+    
+    Callers submit (sql, params) and return immediately. The writer thread drains
+    up to WRITE_BATCH_SIZE items (or whatever arrives within WRITE_BATCH_DELAY),
+    then commits them together with executemany on its own connection, so a
+    burst of card scans costs one commit instead of one per scan.
+    """
+    
+    def __init__(self, batch_size: int = WRITE_BATCH_SIZE, batch_delay: float = WRITE_BATCH_DELAY):
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+    
+    def start(self):
+        """Start the writer thread if it is not already running"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush, 2.0)
+    
+    def submit(self, sql: str, params: tuple):
+        """Queue a write; it is committed by the writer thread shortly after"""
+        if self._thread is None:
+            self.start()
+        self._queue.put((sql, params))
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every write queued so far has been committed (False if the timeout expires)"""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put((None, done))
+        if done.wait(timeout):
+            return True
+        logger.warning(f"Timed out after {timeout}s waiting for queued database writes")
+        return False
+    
+    def _run(self):
+        conn = None
+        while True:
+            batch = [self._queue.get()]
+            try:
+                deadline = time.monotonic() + self.batch_delay
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                if conn is None:
+                    conn = _open_connection()
+                self._commit(conn, batch)
+            except Exception as e:
+                # Keep the thread alive: drop this batch, reopen the connection next time
+                logger.error(f"Database writer dropped {len(batch)} queued items: {e}")
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+                    conn = None
+                # The writes are lost either way; don't leave flush() callers waiting on them
+                for sql, params in batch:
+                    if sql is None:
+                        params.set()
+    
+    def _commit(self, conn: sqlite3.Connection, batch: list):
+        # Group consecutive writes of the same statement so each group is one executemany
+        groups = []
+        flushed = []
+        for sql, params in batch:
+            if sql is None:
+                flushed.append(params)
+            elif groups and groups[-1][0] == sql:
+                groups[-1][1].append(params)
+            else:
+                groups.append((sql, [params]))
+        
+        if groups:
+            try:
+                conn.execute('BEGIN')
+                for sql, rows in groups:
+                    conn.executemany(sql, rows)
+                conn.execute('COMMIT')
+            except Exception as e:
+                if conn.in_transaction:
+                    conn.rollback()
+                logger.error(f"Error committing {sum(len(rows) for _, rows in groups)} queued writes: {e}")
+        
+        for done in flushed:
+            done.set()
+
+class LookupCache:
+    """Thread-safe LRU cache for single-row lookups keyed by card_id
+    
+    Misses (None) are cached too, since unknown cards get scanned repeatedly.
+    Every write must invalidate() the card it touched. A lookup that raced with
+    an invalidation does not store its result, because the generation it read
+    under is no longer current.
+    
+    Invalidation only sees writes made through this module in this process.
+    Writes from another process (e.g. card_id_fixer.py against the live
+    database) are picked up once the entry is `ttl` seconds old.
+    """
+    
+    MISSING = object()
+    
+    def __init__(self, maxsize: int = LOOKUP_CACHE_SIZE, ttl: float = LOOKUP_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+    
+    def get(self, key: str):
+        """Return the cached value, or LookupCache.MISSING if absent or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return self.MISSING
+            if entry[0] <= time.monotonic():
+                del self._data[key]
+                return self.MISSING
+            self._data.move_to_end(key)
+            return entry[1]
+    
+    def put(self, key: str, value, generation: int):
+        """Store a value read while `generation` was current"""
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def update(self, key: str, **fields):
+        """Patch fields of a cached entry in place (no-op if not cached or cached as None)
+        
+        Still counts as a write: the generation moves on so derived caches
+        (e.g. the full user listing) are rebuilt.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry and entry[1]:
+                self._data[key] = (entry[0], {**entry[1], **fields})
+            self.generation += 1
+    
+    def invalidate(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+            self.generation += 1
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.generation += 1
+
+_read_pool = ConnectionPool(READ_POOL_SIZE, read_only=True)
+_write_pool = ConnectionPool(1)
+_writer = BatchWriter()
+_user_cache = LookupCache()
+_pending_cache = LookupCache()
+_fts_enabled = False  # Set by init_db once users_fts exists (needs SQLite built with FTS5)
+_user_records = None  # (_user_cache generation, time.monotonic(), tuple of User) for the full user listing
+
+# Schema, applied with executescript() by init_db and reset_database
+_SCHEMA_SQL = '''
+    CREATE TABLE IF NOT EXISTS users (
+        card_id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        access_level TEXT DEFAULT 'user',
+        department TEXT DEFAULT '',
+        shift TEXT DEFAULT '',
+        status TEXT DEFAULT 'active',
+        created_date TEXT DEFAULT CURRENT_TIMESTAMP,
+        last_access TEXT
+    );
+    
+    CREATE TABLE IF NOT EXISTS pending_requests (
+        card_id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        first_name TEXT DEFAULT '',
+        last_name TEXT DEFAULT '',
+        email TEXT DEFAULT '',
+        department TEXT DEFAULT '',
+        shift TEXT DEFAULT '',
+        requested_date TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+    
+    CREATE TABLE IF NOT EXISTS scan_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        card_id TEXT NOT NULL,
+        scan_time TEXT DEFAULT CURRENT_TIMESTAMP,
+        result TEXT DEFAULT 'unknown'
+    );
+    
+    -- Indexes for user listing/search and per-card scan lookups.
+    -- NOCASE matches LIKE's default case-insensitivity so prefix searches can use them.
+    CREATE INDEX IF NOT EXISTS idx_users_name ON users(name COLLATE NOCASE);
+    CREATE INDEX IF NOT EXISTS idx_users_dept ON users(department COLLATE NOCASE);
+    CREATE INDEX IF NOT EXISTS idx_users_card_nocase ON users(card_id COLLATE NOCASE);
+    CREATE INDEX IF NOT EXISTS idx_scan_events_card ON scan_events(card_id, scan_time);
+    
+    -- Binary-collated indexes so the listings' ORDER BY reads rows in order instead of sorting
+    CREATE INDEX IF NOT EXISTS idx_users_name_order ON users(name);
+    CREATE INDEX IF NOT EXISTS idx_pending_requested ON pending_requests(requested_date);
+'''
+
+# Full-text index over the searchable user columns, kept in sync by triggers
+_FTS_SCHEMA_SQL = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        card_id, name, department,
+        content='users', content_rowid='rowid', tokenize='unicode61'
+    );
+    
+    CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, card_id, name, department)
+        VALUES (new.rowid, new.card_id, new.name, new.department);
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, card_id, name, department)
+        VALUES ('delete', old.rowid, old.card_id, old.name, old.department);
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, card_id, name, department)
+        VALUES ('delete', old.rowid, old.card_id, old.name, old.department);
+        INSERT INTO users_fts(rowid, card_id, name, department)
+        VALUES (new.rowid, new.card_id, new.name, new.department);
+    END;
+'''
+
+_DROP_SQL = '''
+    DROP TABLE IF EXISTS users_fts;
+    DROP TABLE IF EXISTS users;
+    DROP TABLE IF EXISTS pending_requests;
+    DROP TABLE IF EXISTS scan_events;
+'''
+
+# Compact row type for the cached user listing; _USER_COLUMNS below follows its field order
+User = namedtuple('User', 'card_id name access_level department shift status created_date last_access')
+
+# SQL is kept in module-level constants so every call passes sqlite3 the exact
+# same string and hits the per-connection statement cache
+_USER_COLUMNS = ', '.join(User._fields)
+_PENDING_COLUMNS = 'card_id, name, first_name, last_name, email, department, shift, requested_date'
+
+_SQL_INSERT_USER = 'INSERT INTO users (card_id, name, access_level, department, shift, status) VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(card_id) DO NOTHING'
+_SQL_GET_USER = f'SELECT {_USER_COLUMNS} FROM users WHERE card_id = ?'
+_SQL_GET_ALL_USERS = f'SELECT {_USER_COLUMNS} FROM users ORDER BY name'
+_SQL_SEARCH_USERS = f'''
+    SELECT {_USER_COLUMNS} FROM users
+    WHERE card_id LIKE ? ESCAPE '\\' OR name LIKE ? ESCAPE '\\' OR department LIKE ? ESCAPE '\\'
+    ORDER BY name
+'''
+_SQL_SEARCH_USERS_FTS = f'SELECT {_USER_COLUMNS} FROM users WHERE rowid IN (SELECT rowid FROM users_fts WHERE users_fts MATCH ?) ORDER BY name'
+_SQL_UPDATE_USER = 'UPDATE users SET name = ?, access_level = ?, department = ?, shift = ?, status = ? WHERE card_id = ?'
+_SQL_UPDATE_USER_STATUS = 'UPDATE users SET status = ? WHERE card_id = ?'
+_SQL_UPDATE_USER_LAST_ACCESS = 'UPDATE users SET last_access = ? WHERE card_id = ?'
+_SQL_DELETE_USER_RETURNING = 'DELETE FROM users WHERE card_id = ? RETURNING 1'
+
+_SQL_INSERT_PENDING = 'INSERT INTO pending_requests (card_id, name, first_name, last_name, email, department, shift) VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(card_id) DO NOTHING'
+_SQL_UPSERT_PENDING = '''
+    INSERT INTO pending_requests (card_id, name, first_name, last_name, email, department, shift) VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(card_id) DO UPDATE SET name = excluded.name, first_name = excluded.first_name,
+        last_name = excluded.last_name, email = excluded.email, department = excluded.department,
+        shift = excluded.shift, requested_date = excluded.requested_date
+'''
+_SQL_IMPORT_PENDING = '''
+    INSERT OR IGNORE INTO pending_requests (card_id, name, first_name, last_name, email, department, shift)
+    SELECT ?, ?, ?, ?, ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM users WHERE card_id = ?)
+'''
+_SQL_GET_PENDING = f'SELECT {_PENDING_COLUMNS} FROM pending_requests WHERE card_id = ?'
+_SQL_GET_ALL_PENDING = f'SELECT {_PENDING_COLUMNS} FROM pending_requests ORDER BY requested_date'
+_SQL_DELETE_PENDING = 'DELETE FROM pending_requests WHERE card_id = ?'
+_SQL_DELETE_PENDING_RETURNING = 'DELETE FROM pending_requests WHERE card_id = ? RETURNING 1'
+_SQL_DELETE_ALL_PENDING = 'DELETE FROM pending_requests'
+
+_SQL_INSERT_SCAN_EVENT = 'INSERT INTO scan_events (card_id, result) VALUES (?, ?)'
+
+_SQL_VERIFY_REMOVAL = '''
+    SELECT EXISTS (SELECT 1 FROM users WHERE card_id = ?),
+           EXISTS (SELECT 1 FROM pending_requests WHERE card_id = ?),
+           (SELECT COUNT(*) FROM scan_events WHERE card_id = ?)
+'''
+
+def _iter_rows(sql: str, params: tuple = (), row_type=None) -> Iterator[sqlite3.Row]:
+    """Yield result rows in FETCH_SIZE chunks, holding a pooled connection until exhausted
+    
+    Rows are sqlite3.Row unless a namedtuple `row_type` is given, which is built
+    straight from the raw tuple.
+    """
+    with _read_pool.acquire() as conn:
+        cursor = conn.cursor()
+        if row_type is not None:
+            cursor.row_factory = lambda _cursor, row: row_type._make(row)
+        cursor.execute(sql, params)
+        cursor.arraysize = FETCH_SIZE
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                break
+            yield from rows
 
 def get_connection():
-    """Get database connection"""
+    """Get a standalone (unpooled) database connection for ad-hoc scripts"""
     return sqlite3.connect(DB_FILE)
 
+def _init_fts(conn: sqlite3.Connection):
+    """Create the users_fts search index, falling back to LIKE search without FTS5"""
+    global _fts_enabled
+    try:
+        existed = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'users_fts'").fetchone() is not None
+        conn.executescript(f'BEGIN; {_FTS_SCHEMA_SQL} COMMIT;')
+        if not existed:
+            # Index users that were added before the FTS table existed
+            conn.execute("INSERT INTO users_fts(users_fts) VALUES ('rebuild')")
+        _fts_enabled = True
+    except sqlite3.OperationalError as e:
+        if conn.in_transaction:
+            conn.rollback()
+        _fts_enabled = False
+        logger.warning(f"FTS5 not available, user search will use LIKE: {e}")
+
 def init_db():
     """Initialize database with required tables"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Create users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                card_id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                access_level TEXT DEFAULT 'user',
-                department TEXT DEFAULT '',
-                shift TEXT DEFAULT '',
-                status TEXT DEFAULT 'active',
-                created_date TEXT DEFAULT CURRENT_TIMESTAMP,
-                last_access TEXT
-            )
-        ''')
-        
-        # Add shift column if it doesn't exist (for existing databases)
-        try:
-            cursor.execute('ALTER TABLE users ADD COLUMN shift TEXT DEFAULT ""')
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-        
-        # Create pending_requests table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS pending_requests (
-                card_id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                first_name TEXT DEFAULT '',
-                last_name TEXT DEFAULT '',
-                email TEXT DEFAULT '',
-                department TEXT DEFAULT '',
-                shift TEXT DEFAULT '',
-                requested_date TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Create scan_events table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS scan_events (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                card_id TEXT NOT NULL,
-                scan_time TEXT DEFAULT CURRENT_TIMESTAMP,
-                result TEXT DEFAULT 'unknown'
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        with _write_pool.acquire() as conn:
+            # Page size only takes effect on a new database, before WAL is enabled
+            conn.execute('PRAGMA page_size=4096')
+            
+            # WAL lets readers proceed while scan events are being written;
+            # the journal mode is persistent so setting it here covers every connection
+            conn.execute('PRAGMA journal_mode=WAL')
+            
+            conn.executescript(f'BEGIN; {_SCHEMA_SQL} COMMIT;')
+            
+            # Add shift column if it doesn't exist (for existing databases)
+            try:
+                conn.execute('ALTER TABLE users ADD COLUMN shift TEXT DEFAULT ""')
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+            
+            _init_fts(conn)
+        
+        # Scan events are written by the background batch writer
+        _writer.start()
         logger.info("Database initialized successfully")
         
     except Exception as e:
@@ -78,38 +461,51 @@ def init_db():
 def reset_database():
     """Reset database by dropping and recreating all tables"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Drop all tables
-        cursor.execute('DROP TABLE IF EXISTS users')
-        cursor.execute('DROP TABLE IF EXISTS pending_requests')
-        cursor.execute('DROP TABLE IF EXISTS scan_events')
-        
-        conn.commit()
-        conn.close()
-        
-        # Reinitialize with empty tables
-        init_db()
+        _writer.flush(WRITE_FLUSH_TIMEOUT)
+        with _write_pool.acquire() as conn:
+            # Drop all tables and recreate them empty in one transaction
+            conn.executescript(f'BEGIN; {_DROP_SQL} {_SCHEMA_SQL} COMMIT;')
+            _init_fts(conn)
+            
+            # Reclaim the dropped pages and start the planner from fresh statistics
+            conn.execute('VACUUM')
+            conn.execute('ANALYZE')
+        
+        _user_cache.clear()
+        _pending_cache.clear()
         logger.info("Database reset completed")
         
     except Exception as e:
         logger.error(f"Error resetting database: {e}")
         raise
 
-def add_user(card_id: str, name: str, access_level: str = 'user', department: str = '', shift: str = '', status: str = 'active') -> bool:
-    """Add a new user to the database"""
+def optimize_database() -> bool:
+    """Refresh query planner statistics (run periodically or on shutdown)"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        _writer.flush(WRITE_FLUSH_TIMEOUT)
+        with _write_pool.acquire() as conn:
+            # Bound the rows ANALYZE samples per index so a large scan_events table stays cheap
+            conn.execute('PRAGMA analysis_limit=10000')
+            conn.execute('ANALYZE')
+            conn.execute('PRAGMA optimize')
+        
+        logger.info("Database statistics refreshed")
+        return True
         
-        cursor.execute('''
-            INSERT INTO users (card_id, name, access_level, department, shift, status)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (card_id, name, access_level, department, shift, status))
+    except Exception as e:
+        logger.error(f"Error optimizing database: {e}")
+        return False
+
+def add_user(card_id: str, name: str, access_level: str = 'user', department: str = '', shift: str = '', status: str = 'active') -> bool:
+    """Add a new user to the database (returns False if the card already exists)"""
+    try:
+        with _write_pool.acquire() as conn:
+            added = conn.execute(_SQL_INSERT_USER, (card_id, name, access_level, department, shift, status)).rowcount > 0
+        if not added:
+            logger.warning(f"User already exists: {card_id}")
+            return False
+        _user_cache.invalidate(card_id)
         
-        conn.commit()
-        conn.close()
         logger.info(f"Added user: {card_id} - {name}")
         return True
         
@@ -117,6 +513,17 @@ def add_user(card_id: str, name: str, access_level: str = 'user', department: st
         logger.error(f"Error adding user: {e}")
         return False
 
+def _cached_user(card_id: str) -> Optional[Dict[str, Any]]:
+    """The users row for card_id via _user_cache (None if unknown); the dict is shared, don't modify it"""
+    user = _user_cache.get(card_id)
+    if user is LookupCache.MISSING:
+        generation = _user_cache.generation
+        with _read_pool.acquire() as conn:
+            row = conn.execute(_SQL_GET_USER, (card_id,)).fetchone()
+        user = dict(row) if row else None
+        _user_cache.put(card_id, user, generation)
+    return user
+
 def get_user(card_id: str) -> Optional[Dict[str, Any]]:
     """
     Get user by card ID for AUTHORIZATION purposes
@@ -124,56 +531,58 @@ def get_user(card_id: str) -> Optional[Dict[str, Any]]:
     IMPORTANT: This function ONLY checks the 'users' table.
     It does NOT check scan_events - those are audit logs only.
     If a user is deleted, they will NOT be found here and access will be denied.
+    Deletions made by another process (e.g. card_id_fixer.py) take effect
+    within LOOKUP_CACHE_TTL seconds.
     """
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT card_id, name, access_level, department, shift, status, created_date, last_access
-            FROM users WHERE card_id = ?
-        ''', (card_id,))
-        row = cursor.fetchone()
-        conn.close()
-        if row:
-            return {
-                'card_id': row[0],
-                'name': row[1],
-                'access_level': row[2],
-                'department': row[3],
-                'shift': row[4],
-                'status': row[5],
-                'created_date': row[6],
-                'last_access': row[7]
-            }
-        return None
+        user = _cached_user(card_id)
+        # Hand out a copy so callers can't modify the cached entry
+        return dict(user) if user else None
     except Exception as e:
         logger.error(f"Error getting user: {e}")
         return None
 
+def get_user_for_auth(card_id: str) -> Optional[tuple]:
+    """
+    Hot-path authorization lookup: (name, access_level, status) or None if the card is unknown
+    
+    Shares the get_user cache, so repeat scans of a card (known or unknown)
+    don't touch SQLite. Same rules as get_user: only the 'users' table is consulted.
+    """
+    try:
+        user = _cached_user(card_id)
+        return (user['name'], user['access_level'], user['status']) if user else None
+    except Exception as e:
+        logger.error(f"Error getting user for authorization: {e}")
+        return None
+
+def _all_user_records() -> tuple:
+    """All users ordered by name, cached until the next user write or USER_LIST_CACHE_TTL
+    
+    Every user write in this process bumps the _user_cache generation, which
+    retires the cached listing; the TTL picks up writes from other processes.
+    The records are immutable namedtuples, so they are shared as-is.
+    """
+    global _user_records
+    generation = _user_cache.generation
+    now = time.monotonic()
+    cached = _user_records
+    if cached is not None and cached[0] == generation and now - cached[1] < USER_LIST_CACHE_TTL:
+        return cached[2]
+    # Queued last-access updates must land first or the rebuilt listing would miss them
+    _writer.flush(WRITE_FLUSH_TIMEOUT)
+    records = tuple(_iter_rows(_SQL_GET_ALL_USERS, row_type=User))
+    _user_records = (generation, now, records)
+    return records
+
+def iter_user_records() -> Iterator[User]:
+    """Iterate over all users ordered by name as User namedtuples (raises on error)"""
+    return iter(_all_user_records())
+
 def get_all_users() -> List[Dict[str, Any]]:
     """Get all users (explicit column order for stability)"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT card_id, name, access_level, department, shift, status, created_date, last_access
-            FROM users ORDER BY name
-        ''')
-        rows = cursor.fetchall()
-        conn.close()
-        users = []
-        for row in rows:
-            users.append({
-                'card_id': row[0],
-                'name': row[1],
-                'access_level': row[2],
-                'department': row[3],
-                'shift': row[4],
-                'status': row[5],
-                'created_date': row[6],
-                'last_access': row[7]
-            })
-        return users
+        return [record._asdict() for record in _all_user_records()]
     except Exception as e:
         logger.error(f"Error getting all users: {e}")
         return []
@@ -181,16 +590,10 @@ def get_all_users() -> List[Dict[str, Any]]:
 def update_user(card_id: str, name: str, access_level: str, department: str, shift: str, status: str) -> bool:
     """Update user information"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE users SET name = ?, access_level = ?, department = ?, shift = ?, status = ?
-            WHERE card_id = ?
-        ''', (name, access_level, department, shift, status, card_id))
+        with _write_pool.acquire() as conn:
+            conn.execute(_SQL_UPDATE_USER, (name, access_level, department, shift, status, card_id))
+        _user_cache.invalidate(card_id)
         
-        conn.commit()
-        conn.close()
         logger.info(f"Updated user: {card_id}")
         return True
         
@@ -210,31 +613,64 @@ def remove_user(card_id: str) -> bool:
     - scan_events table (for historical audit/usage tracking)
     
     After removal, the card will be treated as "unknown" if scanned again.
+    Use remove_user_and_verify() to also get the verification result.
+    """
+    return 'error' not in remove_user_and_verify(card_id)
+
+def remove_user_and_verify(card_id: str) -> Dict[str, Any]:
+    """
+    Remove a user (see remove_user) and verify the removal in the same transaction
+    Returns the verify_user_removal() result plus the number of rows deleted
     """
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Remove from users table (so they can't access anymore)
-        cursor.execute('DELETE FROM users WHERE card_id = ?', (card_id,))
-        users_removed = cursor.rowcount
-        
-        # Also remove any pending requests for this card
-        cursor.execute('DELETE FROM pending_requests WHERE card_id = ?', (card_id,))
-        pending_removed = cursor.rowcount
-        
-        # Note: We intentionally keep scan_events for audit purposes
-        # These logs are read-only and never used for authorization
-        
-        conn.commit()
-        conn.close()
+        # Make sure queued scan events are counted
+        _writer.flush(WRITE_FLUSH_TIMEOUT)
+        with _write_pool.acquire() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            
+            # Remove from users table (so they can't access anymore)
+            users_removed = len(cursor.execute(_SQL_DELETE_USER_RETURNING, (card_id,)).fetchall())
+            
+            # Also remove any pending requests for this card
+            pending_removed = len(cursor.execute(_SQL_DELETE_PENDING_RETURNING, (card_id,)).fetchall())
+            
+            # Note: We intentionally keep scan_events for audit purposes
+            # These logs are read-only and never used for authorization
+            
+            users_count, pending_count, scan_events_count = cursor.execute(
+                _SQL_VERIFY_REMOVAL, (card_id, card_id, card_id)).fetchone()
+            
+            cursor.execute('COMMIT')
+        _user_cache.invalidate(card_id)
+        _pending_cache.invalidate(card_id)
         
         logger.info(f"User removal complete for {card_id}: {users_removed} user records, {pending_removed} pending requests removed. Audit logs preserved.")
-        return True
+        result = _removal_status(card_id, users_count, pending_count, scan_events_count)
+        result['users_removed'] = users_removed
+        result['pending_requests_removed'] = pending_removed
+        return result
         
     except Exception as e:
         logger.error(f"Error removing user: {e}")
-        return False
+        return {
+            'card_id': card_id,
+            'completely_removed': False,
+            'error': str(e)
+        }
+
+def _removal_status(card_id: str, users_count: int, pending_count: int, scan_events_count: int) -> Dict[str, Any]:
+    """Build the removal verification result from the remaining row counts"""
+    is_completely_removed = (users_count == 0 and pending_count == 0)
+    
+    return {
+        'card_id': card_id,
+        'completely_removed': is_completely_removed,
+        'users_remaining': users_count,
+        'pending_requests_remaining': pending_count,
+        'audit_logs_preserved': scan_events_count,
+        'status': 'COMPLETELY REMOVED' if is_completely_removed else 'INCOMPLETE REMOVAL'
+    }
 
 def verify_user_removal(card_id: str) -> Dict[str, Any]:
     """
@@ -242,33 +678,15 @@ def verify_user_removal(card_id: str) -> Dict[str, Any]:
     Returns status of removal and any remaining references
     """
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Check users table
-        cursor.execute('SELECT COUNT(*) FROM users WHERE card_id = ?', (card_id,))
-        users_count = cursor.fetchone()[0]
-        
-        # Check pending_requests table  
-        cursor.execute('SELECT COUNT(*) FROM pending_requests WHERE card_id = ?', (card_id,))
-        pending_count = cursor.fetchone()[0]
-        
-        # Check scan_events table (these should remain for audit)
-        cursor.execute('SELECT COUNT(*) FROM scan_events WHERE card_id = ?', (card_id,))
-        scan_events_count = cursor.fetchone()[0]
-        
-        conn.close()
-        
-        is_completely_removed = (users_count == 0 and pending_count == 0)
+        # Make sure queued scan events are counted
+        _writer.flush(WRITE_FLUSH_TIMEOUT)
+        with _read_pool.acquire() as conn:
+            # One round-trip: users/pending_requests remaining (card_id is their primary key,
+            # so EXISTS is the count) and scan_events kept for audit
+            users_count, pending_count, scan_events_count = conn.execute(
+                _SQL_VERIFY_REMOVAL, (card_id, card_id, card_id)).fetchone()
         
-        return {
-            'card_id': card_id,
-            'completely_removed': is_completely_removed,
-            'users_remaining': users_count,
-            'pending_requests_remaining': pending_count,
-            'audit_logs_preserved': scan_events_count,
-            'status': 'COMPLETELY REMOVED' if is_completely_removed else 'INCOMPLETE REMOVAL'
-        }
+        return _removal_status(card_id, users_count, pending_count, scan_events_count)
         
     except Exception as e:
         logger.error(f"Error verifying user removal: {e}")
@@ -281,13 +699,9 @@ def verify_user_removal(card_id: str) -> Dict[str, Any]:
 def update_user_status(card_id: str, status: str) -> bool:
     """Update user status"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('UPDATE users SET status = ? WHERE card_id = ?', (status, card_id))
-        
-        conn.commit()
-        conn.close()
+        with _write_pool.acquire() as conn:
+            conn.execute(_SQL_UPDATE_USER_STATUS, (status, card_id))
+        _user_cache.invalidate(card_id)
         return True
         
     except Exception as e:
@@ -295,16 +709,12 @@ def update_user_status(card_id: str, status: str) -> bool:
         return False
 
 def update_user_last_access(card_id: str) -> bool:
-    """Update user's last access time"""
+    """Update user's last access time (queued; committed in batches by the background writer)"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
         current_time = datetime.now().isoformat()
-        cursor.execute('UPDATE users SET last_access = ? WHERE card_id = ?', (current_time, card_id))
-        
-        conn.commit()
-        conn.close()
+        _writer.submit(_SQL_UPDATE_USER_LAST_ACCESS, (current_time, card_id))
+        # The row is not written yet, so patch the cached user rather than invalidating it
+        _user_cache.update(card_id, last_access=current_time)
         return True
         
     except Exception as e:
@@ -313,18 +723,15 @@ def update_user_last_access(card_id: str) -> bool:
 
 def add_pending_request(card_id: str, name: str, first_name: str = '', last_name: str = '', 
                        email: str = '', department: str = '', shift: str = '') -> bool:
-    """Add a pending access request"""
+    """Add a pending access request (returns False if the card already has one)"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        with _write_pool.acquire() as conn:
+            added = conn.execute(_SQL_INSERT_PENDING, (card_id, name, first_name, last_name, email, department, shift)).rowcount > 0
+        if not added:
+            logger.warning(f"Pending request already exists: {card_id}")
+            return False
+        _pending_cache.invalidate(card_id)
         
-        cursor.execute('''
-            INSERT INTO pending_requests (card_id, name, first_name, last_name, email, department, shift)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (card_id, name, first_name, last_name, email, department, shift))
-        
-        conn.commit()
-        conn.close()
         logger.info(f"Added pending request: {card_id} - {name}")
         return True
         
@@ -332,6 +739,44 @@ def add_pending_request(card_id: str, name: str, first_name: str = '', last_name
         logger.error(f"Error adding pending request: {e}")
         return False
 
+def upsert_pending_request(card_id: str, name: str, first_name: str = '', last_name: str = '', 
+                           email: str = '', department: str = '', shift: str = '') -> bool:
+    """Add a pending access request, or replace the existing one for this card (resets requested_date)"""
+    try:
+        with _write_pool.acquire() as conn:
+            conn.execute(_SQL_UPSERT_PENDING, (card_id, name, first_name, last_name, email, department, shift))
+        _pending_cache.invalidate(card_id)
+        
+        logger.info(f"Upserted pending request: {card_id} - {name}")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Error upserting pending request: {e}")
+        return False
+
+def import_pending_requests(requests: List[tuple]) -> int:
+    """
+    Bulk-add pending requests given as (card_id, name, first_name, last_name, email, department, shift)
+    
+    Cards that already have a pending request or a user record are skipped.
+    Everything is inserted with one executemany in a single transaction.
+    Returns the number of requests added.
+    """
+    try:
+        rows = [(*request, request[0]) for request in requests]
+        with _write_pool.acquire() as conn:
+            conn.execute('BEGIN')
+            count = conn.executemany(_SQL_IMPORT_PENDING, rows).rowcount
+            conn.execute('COMMIT')
+        _pending_cache.clear()
+        
+        logger.info(f"Imported {count} pending requests")
+        return count
+        
+    except Exception as e:
+        logger.error(f"Error importing pending requests: {e}")
+        return 0
+
 def get_pending_request(card_id: str) -> Optional[Dict[str, Any]]:
     """
     Get pending request by card ID for ACCESS REQUEST purposes
@@ -341,53 +786,28 @@ def get_pending_request(card_id: str) -> Optional[Dict[str, Any]]:
     If a user is deleted, their pending request is also removed.
     """
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        request = _pending_cache.get(card_id)
+        if request is LookupCache.MISSING:
+            generation = _pending_cache.generation
+            with _read_pool.acquire() as conn:
+                row = conn.execute(_SQL_GET_PENDING, (card_id,)).fetchone()
+            request = dict(row) if row else None
+            _pending_cache.put(card_id, request, generation)
         
-        cursor.execute('SELECT * FROM pending_requests WHERE card_id = ?', (card_id,))
-        row = cursor.fetchone()
-        conn.close()
-        
-        if row:
-            return {
-                'card_id': row[0],
-                'name': row[1],
-                'first_name': row[2],
-                'last_name': row[3],
-                'email': row[4],
-                'department': row[5],
-                'shift': row[6],
-                'requested_date': row[7]
-            }
-        return None
+        return dict(request) if request else None
         
     except Exception as e:
         logger.error(f"Error getting pending request: {e}")
         return None
 
+def iter_all_pending_requests() -> Iterator[Dict[str, Any]]:
+    """Stream all pending requests oldest first, FETCH_SIZE rows at a time (raises on error)"""
+    yield from map(dict, _iter_rows(_SQL_GET_ALL_PENDING))
+
 def get_all_pending_requests() -> List[Dict[str, Any]]:
     """Get all pending requests"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM pending_requests ORDER BY requested_date')
-        rows = cursor.fetchall()
-        conn.close()
-        
-        requests = []
-        for row in rows:
-            requests.append({
-                'card_id': row[0],
-                'name': row[1],
-                'first_name': row[2],
-                'last_name': row[3],
-                'email': row[4],
-                'department': row[5],
-                'shift': row[6],
-                'requested_date': row[7]
-            })
-        return requests
+        return list(iter_all_pending_requests())
         
     except Exception as e:
         logger.error(f"Error getting pending requests: {e}")
@@ -396,13 +816,10 @@ def get_all_pending_requests() -> List[Dict[str, Any]]:
 def remove_pending_request(card_id: str) -> bool:
     """Remove pending request"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        with _write_pool.acquire() as conn:
+            conn.execute(_SQL_DELETE_PENDING, (card_id,))
+        _pending_cache.invalidate(card_id)
         
-        cursor.execute('DELETE FROM pending_requests WHERE card_id = ?', (card_id,))
-        
-        conn.commit()
-        conn.close()
         logger.info(f"Removed pending request: {card_id}")
         return True
         
@@ -413,18 +830,10 @@ def remove_pending_request(card_id: str) -> bool:
 def remove_all_pending_requests() -> int:
     """Remove all pending requests and return count of removed requests"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Get count first
-        cursor.execute('SELECT COUNT(*) FROM pending_requests')
-        count = cursor.fetchone()[0]
-        
-        # Delete all
-        cursor.execute('DELETE FROM pending_requests')
-        
-        conn.commit()
-        conn.close()
+        with _write_pool.acquire() as conn:
+            # rowcount reports the deleted rows, so no separate COUNT(*) is needed
+            count = conn.execute(_SQL_DELETE_ALL_PENDING).rowcount
+        _pending_cache.clear()
         logger.info(f"Removed {count} pending requests")
         return count
         
@@ -433,51 +842,48 @@ def remove_all_pending_requests() -> int:
         return 0
 
 def log_scan_event(card_id: str, result: str = 'unknown') -> bool:
-    """Log a card scan event"""
+    """Log a card scan event (queued; committed in batches by the background writer)"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO scan_events (card_id, result)
-            VALUES (?, ?)
-        ''', (card_id, result))
-        
-        conn.commit()
-        conn.close()
+        _writer.submit(_SQL_INSERT_SCAN_EVENT, (card_id, result))
         return True
         
     except Exception as e:
         logger.error(f"Error logging scan event: {e}")
         return False
 
+def flush_writes(timeout: Optional[float] = None) -> bool:
+    """Block until queued scan events and last-access updates are committed"""
+    return _writer.flush(timeout)
+
+def _fts_match_query(query: str) -> str:
+    """Turn free text into an FTS5 query: every word must prefix-match a token"""
+    return ' '.join('"' + term.replace('"', '""') + '"*' for term in query.split())
+
+def _like_prefix_pattern(query: str) -> str:
+    """Escape LIKE wildcards in user input and turn it into a prefix pattern"""
+    escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return escaped + '%'
+
+def iter_search_users(query: str) -> Iterator[Dict[str, Any]]:
+    """Stream users matching name, card ID, or department, FETCH_SIZE rows at a time (raises on error)
+    
+    Uses the users_fts index (word-prefix matching) when available,
+    otherwise an indexed LIKE prefix match on each column.
+    """
+    if _fts_enabled:
+        match_query = _fts_match_query(query)
+        if match_query:
+            yield from map(dict, _iter_rows(_SQL_SEARCH_USERS_FTS, (match_query,)))
+        return
+    
+    # Prefix pattern (no leading wildcard) so each column is a range scan on its NOCASE index
+    search_pattern = _like_prefix_pattern(query)
+    yield from map(dict, _iter_rows(_SQL_SEARCH_USERS, (search_pattern, search_pattern, search_pattern)))
+
 def search_users(query: str) -> List[Dict[str, Any]]:
     """Search users by name, card ID, or department (explicit columns)"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        search_pattern = f'%{query}%'
-        cursor.execute('''
-            SELECT card_id, name, access_level, department, shift, status, created_date, last_access
-            FROM users
-            WHERE card_id LIKE ? OR name LIKE ? OR department LIKE ?
-            ORDER BY name
-        ''', (search_pattern, search_pattern, search_pattern))
-        rows = cursor.fetchall()
-        conn.close()
-        users = []
-        for row in rows:
-            users.append({
-                'card_id': row[0],
-                'name': row[1],
-                'access_level': row[2],
-                'department': row[3],
-                'shift': row[4],
-                'status': row[5],
-                'created_date': row[6],
-                'last_access': row[7]
-            })
-        return users
+        return list(iter_search_users(query))
     except Exception as e:
         logger.error(f"Error searching users: {e}")
         return []
@@ -6,7 +6,7 @@ Handles LabJack U3 data acquisition and I/O operations
 import time
 import threading
 import logging
-from typing import Optional, Dict, Any, Callable, List
+from typing import Optional, Dict, Any, Callable, List, Tuple
 from datetime import datetime
 
 try:
@@ -18,16 +18,25 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Internal temperature sensor slope (K per bit), from the U3 datasheet
+INTERNAL_TEMP_SLOPE = 0.013021
+
 class LabJackU3:
     """LabJack U3 handler for I/O operations and data acquisition"""
     
     def __init__(self, on_input_change: Optional[Callable] = None):
         self.device = None
         self.device_info = None
+        self._calibration = None  # Read once per connection; constant for the device
         self.running = False
         self.monitor_thread = None
         self.on_input_change = on_input_change
         
+        # Polling speeds up after any input change and backs off while idle
+        self.poll_interval_active = 0.1  # Seconds between polls right after a change
+        self.poll_interval_idle = 0.5    # Slowest poll interval once nothing is happening
+        self._idle_cycles = 0
+        
         # U3 Configuration - Based on requirements:
         # FIO0-FIO3 as analog inputs, FIO4-FIO5 as digital inputs, FIO6-FIO7 as digital outputs
         self.input_channels = ['FIO4', 'FIO5']  # Digital inputs to monitor
@@ -37,15 +46,40 @@ class LabJackU3:
         # Input floating state management - assume unconnected inputs are LOW
         self.floating_inputs_as_low = True  # Treat floating/unconnected inputs as LOW
         self.stable_input_readings = {}  # Track stable readings to filter noise
+        self._inputs_read_at = 0.0  # time.monotonic() of the last successful digital read
+        self.snapshot_max_age = 1.0  # Seconds stable_input_readings may stand in for a device read
         
         # Shear lock state tracking
         self.shear_unlocked = False  # Track if shear is currently unlocked
+        self._unlock_timer = None  # Turns the unlock relay back off
         
         # State tracking
         self.last_input_states = {}
         self.output_states = {}
         self.last_analog_values = {}
         
+        # Channel name -> DIO pin number, parsed once (EIO0-EIO3 drive the relay and status LEDs)
+        self._pin_num = {}
+        for channel in self.input_channels + self.output_channels + ['EIO0', 'EIO1', 'EIO2', 'EIO3']:
+            pin_num = self._pin_number(channel)
+            if pin_num is not None:
+                self._pin_num[channel] = pin_num
+        
+        # Output channels that can be driven, validated once here -> pin number
+        self._output_pins = {channel: self._pin_num[channel] for channel in self.output_channels
+                             if channel in self._pin_num}
+        
+        # (channel, pin) pairs for the digital inputs, in polling order
+        self._input_pins = [(channel, self._pin_num[channel]) for channel in self.input_channels
+                            if channel in self._pin_num]
+        
+        # Feedback command lists for polling, built by _configure_channels
+        self._digital_commands = []  # BitStateRead x3 for every input pin
+        self._analog_commands = []   # One AIN per analog channel
+        self._analog_inputs = []     # (channel, ain_num, low_voltage) matching _analog_commands
+        self._poll_commands = []     # Digital then analog, sent together by read_all_batched
+        self._state_write_cmds = {}  # (pin_num, state) -> BitStateWrite for every known output pin
+        
         if not LABJACK_AVAILABLE:
             logger.warning("LabJack U3 library not available. LabJack functionality disabled.")
     
@@ -72,6 +106,9 @@ class LabJackU3:
             # Configure I/O channels
             self._configure_channels()
             
+            # Calibration constants never change for a device, so fetch them once
+            self._calibration = self.get_calibration_constants()
+            
             logger.info(f"Connected to LabJack U3 (SN: {self.device_info['serial_number']})")
             return True
             
@@ -94,10 +131,20 @@ class LabJackU3:
                 self.device.close()
                 self.device = None
                 self.device_info = None
+                self._calibration = None
             logger.info("Disconnected from LabJack U3")
         except Exception as e:
             logger.error(f"Error disconnecting LabJack U3: {e}")
     
+    @staticmethod
+    def _pin_number(channel: str) -> Optional[int]:
+        """Map an FIO/EIO channel name to its DIO pin number (None for other channels)"""
+        if channel.startswith('FIO'):
+            return int(channel.replace('FIO', ''))
+        if channel.startswith('EIO'):
+            return int(channel.replace('EIO', '')) + 8  # EIO pins are offset by 8
+        return None
+    
     def is_connected(self) -> bool:
         """Check if LabJack U3 is connected"""
         return self.device is not None and LABJACK_AVAILABLE
@@ -106,10 +153,36 @@ class LabJackU3:
         """Get LabJack device information"""
         return self.device_info
     
+    def _build_commands(self):
+        """Build the Feedback command lists used for polling and output writes
+        
+        Pure Python apart from the HV flag, so it runs before any configuration I/O:
+        a failed configure step must not leave polling and output writes without commands.
+        """
+        # Build the analog Feedback commands once. On a U3-HV, AIN0-AIN3 are the
+        # high-voltage inputs and use a different calibration (same rule as getAIN).
+        is_hv = getattr(self.device, 'isHV', False)
+        self._analog_inputs = []
+        for channel in self.analog_channels:
+            ain_num = int(channel.replace('AIN', ''))
+            self._analog_inputs.append((channel, ain_num, not (is_hv and ain_num < 4)))
+        self._analog_commands = [u3.AIN(ain_num, 31, LongSettling=False, QuickSample=True)
+                                 for _, ain_num, _ in self._analog_inputs]
+        
+        # Inputs are sampled 3 times to filter noise from floating pins
+        self._digital_commands = [u3.BitStateRead(pin_num) for _, pin_num in self._input_pins] * 3
+        self._poll_commands = self._digital_commands + self._analog_commands
+        
+        # Output writes reuse prebuilt commands, one per pin and level
+        self._state_write_cmds = {(pin_num, state): u3.BitStateWrite(pin_num, int(state))
+                                  for pin_num in self._pin_num.values() for state in (False, True)}
+    
     def _configure_channels(self):
         """Configure I/O channels"""
         if not self.is_connected():
             return
+        
+        self._build_commands()
 
         try:
             # First, read the current configuration to understand the state
@@ -129,68 +202,45 @@ class LabJackU3:
 
             logger.info(f"New U3 config: {new_config}")
 
-            # Explicitly set pull-down resistors for FIO4 and FIO5 to avoid floating states
-            try:
-                self.device.writeRegister(5004, 0)  # FIO4 pull-down
-                logger.info("Configured pull-down resistor for FIO4")
-            except Exception as e:
-                logger.error(f"Failed to configure pull-down resistor for FIO4: {e}")
-
-            try:
-                self.device.writeRegister(5005, 0)  # FIO5 pull-down
-                logger.info("Configured pull-down resistor for FIO5")
-            except Exception as e:
-                logger.error(f"Failed to configure pull-down resistor for FIO5: {e}")
-
+            # Explicitly set pull-down resistors for FIO4 and FIO5 to avoid floating states.
+            # A list value is one Modbus write-multiple-registers request covering
+            # consecutive registers, so each block below is a single transaction.
+            # 5004/5005 are float registers (two words each), so three zero words
+            # clear the same 5004-5006 range the separate writes did.
             try:
-                self.device.writeRegister(6004, 0)  # Set FIO4 state to low
-                logger.info("Forced FIO4 to low state")
+                self.device.writeRegister(5004, [0, 0, 0])  # FIO4/FIO5 pull-down
+                logger.info("Configured pull-down resistors for FIO4 and FIO5")
             except Exception as e:
-                logger.error(f"Failed to force FIO4 to low state: {e}")
+                logger.error(f"Failed to configure pull-down resistors for FIO4/FIO5: {e}")
 
             try:
-                self.device.writeRegister(6005, 0)  # Set FIO5 state to low
-                logger.info("Forced FIO5 to low state")
+                self.device.writeRegister(6004, [0, 0])  # Set FIO4/FIO5 state to low
+                logger.info("Forced FIO4 and FIO5 to low state")
             except Exception as e:
-                logger.error(f"Failed to force FIO5 to low state: {e}")
+                logger.error(f"Failed to force FIO4/FIO5 to low state: {e}")
             
             # Give the configuration a moment to take effect
             time.sleep(0.1)
             
-            # Now configure pins for digital I/O operations
-            # Set input channels as inputs (direction = 0)
-            for i, channel in enumerate(self.input_channels):
-                if channel.startswith('FIO'):
-                    pin_num = int(channel.replace('FIO', ''))
-                elif channel.startswith('EIO'):
-                    pin_num = int(channel.replace('EIO', '')) + 8  # EIO pins are offset by 8
-                else:
-                    continue
-                    
-                try:
-                    self.device.getFeedback(u3.BitDirWrite(pin_num, 0))  # Set as input
-                    # Initialize state tracking - floating inputs will be handled in read logic
-                    self.last_input_states[channel] = False
-                    logger.debug(f"Configured {channel} (pin {pin_num}) as digital input")
-                except Exception as e:
-                    logger.error(f"Failed to configure {channel} as input: {e}")
+            # Now configure pins for digital I/O operations in one Feedback packet:
+            # inputs get direction 0, outputs direction 1 and are driven low
+            pin_commands = [u3.BitDirWrite(pin_num, 0) for _, pin_num in self._input_pins]  # Set as input
+            for pin_num in self._output_pins.values():
+                pin_commands.append(u3.BitDirWrite(pin_num, 1))  # Set as output
+                pin_commands.append(u3.BitStateWrite(pin_num, 0))  # Set low
             
-            # Set output channels as outputs (direction = 1) and initialize to low
-            for i, channel in enumerate(self.output_channels):
-                if channel.startswith('FIO'):
-                    pin_num = int(channel.replace('FIO', ''))
-                elif channel.startswith('EIO'):
-                    pin_num = int(channel.replace('EIO', '')) + 8  # EIO pins are offset by 8
-                else:
-                    continue
-                    
-                try:
-                    self.device.getFeedback(u3.BitDirWrite(pin_num, 1))  # Set as output
-                    self.device.getFeedback(u3.BitStateWrite(pin_num, 0))  # Set low
+            try:
+                if pin_commands:
+                    self.device.getFeedback(pin_commands)
+                # Initialize state tracking - floating inputs will be handled in read logic
+                for channel, _ in self._input_pins:
+                    self.last_input_states[channel] = False
+                for channel in self._output_pins:
                     self.output_states[channel] = False
-                    logger.debug(f"Configured {channel} (pin {pin_num}) as digital output")
-                except Exception as e:
-                    logger.error(f"Failed to configure {channel} as output: {e}")
+                logger.debug(f"Configured {len(self._input_pins)} digital inputs and "
+                             f"{len(self._output_pins)} digital outputs")
+            except Exception as e:
+                logger.error(f"Failed to configure digital I/O pins: {e}")
             
             # Initialize analog input tracking
             for channel in self.analog_channels:
@@ -207,43 +257,11 @@ class LabJackU3:
             return {}
 
         try:
-            states = {}
-            for channel in self.input_channels:
-                if channel.startswith('FIO'):
-                    pin_num = int(channel.replace('FIO', ''))
-                elif channel.startswith('EIO'):
-                    pin_num = int(channel.replace('EIO', '')) + 8  # EIO pins are offset by 8
-                else:
-                    continue
-
-                # Read the pin state multiple times to filter noise from floating inputs
-                readings = []
-                for _ in range(3):  # Take 3 quick readings
-                    result = self.device.getFeedback(u3.BitStateRead(pin_num))
-                    readings.append(bool(result[0]))
-                    time.sleep(0.001)  # Small delay between readings
-
-                # If readings are inconsistent (floating), default to LOW
-                if len(set(readings)) > 1:  # Inconsistent readings indicate floating
-                    if self.floating_inputs_as_low:
-                        stable_state = False  # Treat floating as LOW
-                        logger.debug(f"{channel} appears to be floating - setting to LOW")
-                    else:
-                        stable_state = True   # Treat floating as HIGH
-                        logger.debug(f"{channel} appears to be floating - setting to HIGH")
-                else:
-                    stable_state = readings[0]  # All readings consistent
-
-                # Store stable reading for tracking
-                self.stable_input_readings[channel] = stable_state
-                states[channel] = stable_state
-
-                # Only log when state actually changes from last known state
-                last_state = self.last_input_states.get(channel, None)
-                if last_state is None or last_state != stable_state:
-                    logger.info(f"Channel {channel}: State changed to {stable_state}")
-
-            return states
+            if not self._digital_commands:
+                return {}
+            
+            # Every pin is read 3 times in one Feedback packet (one USB round trip)
+            return self._decode_digital_inputs(self.device.getFeedback(self._digital_commands))
 
         except Exception as e:
             logger.error(f"Error reading digital inputs: {e}")
@@ -255,36 +273,84 @@ class LabJackU3:
             return {}
         
         try:
-            values = {}
-            for channel in self.analog_channels:
-                ain_num = int(channel.replace('AIN', ''))
-                # Read single-ended voltage
-                result = self.device.getAIN(ain_num)
-                values[channel] = round(result, 3)
-            return values
+            if not self._analog_commands:
+                return {}
+            
+            # One Feedback packet for every channel instead of a getAIN round trip each
+            return self._decode_analog_inputs(self.device.getFeedback(self._analog_commands))
         except Exception as e:
             logger.error(f"Error reading analog inputs: {e}")
             return {}
     
+    def read_all_batched(self) -> Tuple[Dict[str, bool], Dict[str, float]]:
+        """Read digital and analog inputs together in a single Feedback packet"""
+        if not self.is_connected() or not self._poll_commands:
+            return {}, {}
+        
+        try:
+            results = self.device.getFeedback(self._poll_commands)
+            split = len(self._digital_commands)
+            return (self._decode_digital_inputs(results[:split]),
+                    self._decode_analog_inputs(results[split:]))
+        except Exception as e:
+            logger.error(f"Error reading LabJack inputs: {e}")
+            # Don't let readers keep serving the last good poll after a USB fault
+            self.stable_input_readings.clear()
+            return {}, {}
+    
+    def _decode_digital_inputs(self, results: List[int]) -> Dict[str, bool]:
+        """Turn the 3 BitStateRead samples per pin into stable states"""
+        pin_count = len(self._input_pins)
+        states = {}
+        for index, (channel, _) in enumerate(self._input_pins):
+            readings = results[index::pin_count]
+            high_count = sum(readings)  # BitStateRead returns 0 or 1
+
+            # If readings are inconsistent (floating), default to LOW
+            if 0 < high_count < len(readings):  # Inconsistent readings indicate floating
+                if self.floating_inputs_as_low:
+                    stable_state = False  # Treat floating as LOW
+                    logger.debug(f"{channel} appears to be floating - setting to LOW")
+                else:
+                    stable_state = True   # Treat floating as HIGH
+                    logger.debug(f"{channel} appears to be floating - setting to HIGH")
+            else:
+                stable_state = high_count > 0  # All readings consistent
+
+            # Store stable reading for tracking
+            self.stable_input_readings[channel] = stable_state
+            states[channel] = stable_state
+
+            # Only log when state actually changes from last known state
+            last_state = self.last_input_states.get(channel, None)
+            if last_state is None or last_state != stable_state:
+                logger.info(f"Channel {channel}: State changed to {stable_state}")
+
+        self._inputs_read_at = time.monotonic()
+        return states
+    
+    def _decode_analog_inputs(self, raw_values: List[int]) -> Dict[str, float]:
+        """Convert raw AIN bits to calibrated voltages"""
+        values = {}
+        for (channel, ain_num, low_voltage), bits in zip(self._analog_inputs, raw_values):
+            # Read single-ended voltage
+            voltage = self.device.binaryToCalibratedAnalogVoltage(
+                bits, isLowVoltage=low_voltage, isSingleEnded=True, channelNumber=ain_num)
+            values[channel] = round(voltage, 3)
+        return values
+    
     def set_digital_output(self, channel: str, state: bool) -> bool:
         """Set digital output state"""
         if not self.is_connected():
             return False
         
-        if channel not in self.output_channels:
+        pin_num = self._output_pins.get(channel)
+        if pin_num is None:
             logger.error(f"Invalid output channel: {channel}")
             return False
         
         try:
-            if channel.startswith('FIO'):
-                pin_num = int(channel.replace('FIO', ''))
-            elif channel.startswith('EIO'):
-                pin_num = int(channel.replace('EIO', '')) + 8  # EIO pins are offset by 8
-            else:
-                logger.error(f"Unknown channel type: {channel}")
-                return False
-                
-            self.device.getFeedback(u3.BitStateWrite(pin_num, int(state)))
+            self._write_pin(pin_num, state)
             self.output_states[channel] = state
             logger.info(f"Set {channel} to {'HIGH' if state else 'LOW'}")
             return True
@@ -292,6 +358,10 @@ class LabJackU3:
             logger.error(f"Error setting digital output: {e}")
             return False
     
+    def _write_pin(self, pin_num: int, state: bool):
+        """Drive an already-validated output pin with its prebuilt BitStateWrite (raises on error)"""
+        self.device.getFeedback(self._state_write_cmds[(pin_num, bool(state))])
+    
     def set_analog_output(self, channel: str, voltage: float) -> bool:
         """Set analog output voltage (DAC channels)"""
         if not self.is_connected():
@@ -324,12 +394,13 @@ class LabJackU3:
         if success:
             self.shear_unlocked = True
             
-            # Schedule turning off the relay after duration
-            def turn_off_relay():
-                time.sleep(duration)
-                self.set_digital_output('EIO0', False)
-            
-            threading.Thread(target=turn_off_relay, daemon=True).start()
+            # Schedule turning off the relay after duration; a repeat unlock restarts
+            # the countdown instead of being cut short by the earlier timer
+            if self._unlock_timer:
+                self._unlock_timer.cancel()
+            self._unlock_timer = threading.Timer(duration, self.set_digital_output, args=('EIO0', False))
+            self._unlock_timer.daemon = True
+            self._unlock_timer.start()
             
             logger.info(f"Shear unlock triggered for {duration} seconds")
         
@@ -337,6 +408,9 @@ class LabJackU3:
     
     def force_shear_lock(self) -> bool:
         """Force shear to lock immediately"""
+        if self._unlock_timer:
+            self._unlock_timer.cancel()
+            self._unlock_timer = None
         success = self.set_digital_output('EIO0', False)  # Deactivate unlock relay
         if success:
             self.shear_unlocked = False
@@ -357,15 +431,28 @@ class LabJackU3:
         
         return self.set_digital_output(led_mapping[color], state)
     
+    def _read_input(self, channel: str) -> bool:
+        """Latest stable state of a digital input
+        
+        While monitoring, the monitor thread refreshes stable_input_readings every
+        poll, so that is returned without another USB round trip as long as it is
+        younger than snapshot_max_age; otherwise the device is read directly.
+        """
+        if self._snapshot_fresh() and channel in self.stable_input_readings:
+            return self.stable_input_readings[channel]
+        return self.read_digital_inputs().get(channel, False)
+    
+    def _snapshot_fresh(self) -> bool:
+        """True while monitoring and the monitor thread's last digital read is recent"""
+        return self.running and time.monotonic() - self._inputs_read_at < self.snapshot_max_age
+    
     def read_shear_sensor(self) -> bool:
         """Read shear position sensor"""
-        states = self.read_digital_inputs()
-        return states.get('FIO4', False)  # Shear locked = True
+        return self._read_input('FIO4')  # Shear locked = True
     
     def read_motion_sensor(self) -> bool:
         """Read motion detection sensor"""
-        states = self.read_digital_inputs()
-        return states.get('FIO5', False)  # Motion detected = True
+        return self._read_input('FIO5')  # Motion detected = True
     
     def read_temperature_sensor(self) -> Optional[float]:
         """Read temperature from analog sensor"""
@@ -387,10 +474,9 @@ class LabJackU3:
         while self.running:
             try:
                 loop_count += 1
-                # Heartbeat every 10 loops (5 seconds)
+                # Heartbeat every 10 loops
                 if loop_count % 10 == 0:
-                    print(f"[MONITOR HEARTBEAT] Loop #{loop_count} - Thread is running")
-                    logger.info(f"Monitor loop heartbeat #{loop_count}")
+                    logger.debug(f"Monitor loop heartbeat #{loop_count}")
                 if not self.is_connected():
                     # Try to reconnect
                     if self.connect():
@@ -399,17 +485,22 @@ class LabJackU3:
                         time.sleep(5)  # Wait before retry
                         continue
                 
-                # Read current states
-                current_inputs = self.read_digital_inputs()
-                current_analogs = self.read_analog_inputs()
+                # Read current states (digital and analog in one USB round trip)
+                current_inputs, current_analogs = self.read_all_batched()
+                # Every change seen in this poll shares the sample's timestamp
+                timestamp = datetime.now().isoformat()
                 
-                print(f"[MONITOR DEBUG] Current inputs: {current_inputs}")
-                print(f"[MONITOR DEBUG] Last input states: {self.last_input_states}")
+                # Per-poll state dump; skip building the strings unless debug logging is on
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Current inputs: {current_inputs}, last input states: {self.last_input_states}")
+                
+                changed = False
                 
                 # Check for input changes
                 for channel, current_state in current_inputs.items():
                     last_state = self.last_input_states.get(channel, False)
                     if current_state != last_state:
+                        changed = True
                         print(f"[LABJACK MONITOR] State change detected: {channel} {last_state} -> {current_state}")
                         print(f"[LABJACK MONITOR] Callback available: {self.on_input_change is not None}")
                         
@@ -418,7 +509,7 @@ class LabJackU3:
                         change_data = {
                             'channel': channel,
                             'state': current_state,
-                            'timestamp': datetime.now().isoformat(),
+                            'timestamp': timestamp,
                             'change_type': 'digital_input'
                         }
                         
@@ -435,19 +526,20 @@ class LabJackU3:
                 for channel, current_value in current_analogs.items():
                     last_value = self.last_analog_values.get(channel, 0.0)
                     if abs(current_value - last_value) > 0.1:
+                        changed = True
                         self.last_analog_values[channel] = current_value
                         
                         change_data = {
                             'channel': channel,
                             'value': current_value,
-                            'timestamp': datetime.now().isoformat(),
+                            'timestamp': timestamp,
                             'change_type': 'analog_input'
                         }
                         
                         if self.on_input_change:
                             self.on_input_change(change_data)
                 
-                time.sleep(0.5)  # 500ms polling rate - reduced frequency
+                time.sleep(self._next_poll_interval(changed))
                 
             except Exception as e:
                 logger.error(f"Error in LabJack U3 monitor loop: {e}")
@@ -455,6 +547,11 @@ class LabJackU3:
         
         logger.info("LabJack U3 monitoring stopped")
     
+    def _next_poll_interval(self, changed: bool) -> float:
+        """Poll at the active rate after a change, slowing by one step per 10 idle polls"""
+        self._idle_cycles = 0 if changed else self._idle_cycles + 1
+        return min(self.poll_interval_idle, self.poll_interval_active * (1 + self._idle_cycles // 10))
+    
     def set_floating_input_mode(self, treat_as_low: bool = True):
         """Configure how floating/unconnected inputs should be interpreted
         
@@ -498,12 +595,23 @@ class LabJackU3:
         self.disconnect()
         logger.info("LabJack U3 monitoring stopped")
     
-    def get_all_states(self) -> Dict[str, Any]:
-        """Get current state of all channels"""
+    def get_all_states(self, fresh: bool = False) -> Dict[str, Any]:
+        """Get current state of all channels
+        
+        While monitoring, inputs come from the monitor thread's latest poll (no USB
+        traffic) if it is recent; pass fresh=True, or stop monitoring, to read the device directly.
+        """
+        if fresh or not self._snapshot_fresh():
+            digital_inputs, analog_inputs = self.read_all_batched()
+        else:
+            # Plain dict copies are atomic under the GIL, so no lock is needed
+            digital_inputs = dict(self.stable_input_readings)
+            analog_inputs = dict(self.last_analog_values)
+        
         return {
-            'digital_inputs': self.read_digital_inputs(),
+            'digital_inputs': digital_inputs,
             'digital_outputs': self.output_states.copy(),
-            'analog_inputs': self.read_analog_inputs(),
+            'analog_inputs': analog_inputs,
             'device_info': self.device_info,
             'connected': self.is_connected()
         }
@@ -538,8 +646,10 @@ class LabJackU3:
             channel_index = int(channel.replace('AIN', ''))
             raw_value = self.device.getAIN(channel_index)
 
-            # Apply calibration constants
-            constants = self.get_calibration_constants()
+            # Apply calibration constants (cached at connect; retried if that read failed)
+            if self._calibration is None:
+                self._calibration = self.get_calibration_constants()
+            constants = self._calibration
             if not constants:
                 return None
 
@@ -547,7 +657,7 @@ class LabJackU3:
             offset = constants["lv_ain_se_offset"]
             voltage = (slope * raw_value) + offset
 
-            logger.info(f"Analog input {channel}: Raw={raw_value}, Voltage={voltage}")
+            logger.debug(f"Analog input {channel}: Raw={raw_value}, Voltage={voltage}")
             return voltage
         except Exception as e:
             logger.error(f"Failed to read analog input {channel}: {e}")
@@ -563,10 +673,9 @@ class LabJackU3:
             raw_value = self.device.getAIN(30)
 
             # Apply temperature calibration
-            temp_slope = 0.013021  # Example slope from datasheet
-            temperature_kelvin = raw_value * temp_slope
+            temperature_kelvin = raw_value * INTERNAL_TEMP_SLOPE
 
-            logger.info(f"Internal temperature: Raw={raw_value}, Temp(K)={temperature_kelvin}")
+            logger.debug(f"Internal temperature: Raw={raw_value}, Temp(K)={temperature_kelvin}")
             return temperature_kelvin
         except Exception as e:
             logger.error(f"Failed to read internal temperature: {e}")